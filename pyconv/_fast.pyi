@@ -0,0 +1,7 @@
+def convert_line(line: bytes, base_in: int, fmt: str) -> str: ...
+
+class LineConverter:
+    def __init__(
+        self, base_in: int, fmt: str, max_len: int, cache_size: int
+    ) -> None: ...
+    def __call__(self, line: bytes) -> str: ...
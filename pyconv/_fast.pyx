@@ -0,0 +1,78 @@
+# cython: language_level=3
+"""
+Filename: _fast.pyx
+Author: Simon Crampton
+Created: October 14, 2026
+Description: Optional compiled fast path for converting the lines of a file,
+            parses and formats each number without going through Python bytecode
+
+License:
+    This code is provided under the GPL V3 License. See the LICENSE file
+    for details.
+"""
+
+from cpython.long cimport PyLong_FromString
+from cpython.object cimport PyObject_Format, PyObject_Str
+
+
+cpdef str convert_line(bytes line, int base_in, str fmt):
+    """
+    Parses a line holding a number of the given base and formats it with the
+    given format spec, follows the same parsing rules as int(line, base_in).
+
+    Args:
+        line (bytes): single line of the input file without its line separator
+        base_in (int): radix of the number in the line
+        fmt (str): format spec of the base type to convert to
+
+    Returns:
+        str: string representation of the converted number
+
+    Raises:
+        ValueError on an invalid number for the base.
+    """
+    cdef const char *start = line
+    cdef char *end
+    num = PyLong_FromString(start, &end, base_in)
+
+    # PyLong_FromString stops at a null byte, int() rejects one
+    if end != start + len(line):
+        raise ValueError(f"invalid literal for int() with base {base_in}: {line!r}")
+
+    # str() skips parsing the format spec
+    if fmt == "d":
+        return PyObject_Str(num)
+    return PyObject_Format(num, fmt)
+
+
+cdef class LineConverter:
+    """
+    Callable binding the radix and format spec of one file conversion, a drop
+    in for the pure Python converter built by pyconv_calc._line_converter.
+    Conversions of lines up to max_len bytes are cached, until the cache holds
+    cache_size entries.
+    """
+
+    cdef int base_in
+    cdef str fmt
+    cdef Py_ssize_t max_len
+    cdef Py_ssize_t cache_size
+    cdef dict cache
+
+    def __init__(self, int base_in, str fmt, Py_ssize_t max_len, Py_ssize_t cache_size):
+        self.base_in = base_in
+        self.fmt = fmt
+        self.max_len = max_len
+        self.cache_size = cache_size
+        self.cache = {}
+
+    def __call__(self, bytes line):
+        if len(line) > self.max_len:
+            return convert_line(line, self.base_in, self.fmt)
+
+        converted = self.cache.get(line)
+        if converted is None:
+            converted = convert_line(line, self.base_in, self.fmt)
+            if len(self.cache) < self.cache_size:
+                self.cache[line] = converted
+        return converted
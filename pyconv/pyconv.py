@@ -11,7 +11,6 @@ License:
 """
 
 import subprocess
-import os
 import sys
 import click
 
@@ -74,8 +73,21 @@ def conv(input_num: str, input_base: str, convert_to: str) -> None:
 @click.option(
     "-x", "--hex", "convert_to", flag_value="X", help="Convert to hexadecimal"
 )
+@click.option(
+    "--prevalidate",
+    is_flag=True,
+    help=(
+        "Strict mode, only convert lines of plain digits of the input base. "
+        "Faster on files with many invalid lines, rejects whitespace, signs, "
+        "prefixes and underscores"
+    ),
+)
 def from_file(
-    input_file: click.Path, output_file: click.Path, input_base: str, convert_to: str
+    input_file: click.Path,
+    output_file: click.Path,
+    input_base: str,
+    convert_to: str,
+    prevalidate: bool,
 ) -> None:
     """
     Takes in command line arguments for a file containing numbers of one base
@@ -88,22 +100,27 @@ def from_file(
                                 converted numbers
         input_base (str): Base of the input number ('b', 'o', 'd', 'x').
         convert_to (str): Base to convert the number to ('-b', '-o', '-d', '-x').
+        prevalidate (bool): Strict mode, lines which are not plain digits of
+                            input_base are logged as invalid
     """
     if not convert_to:
         raise click.UsageError(
             "You must specify a target conversion base using -b, -o, -d, or -x."
         )
 
-    # Get the path to the pyconv_calc.py
-    script_path = os.path.join(os.path.dirname(__file__), "pyconv_calc.py")
+    # Run pyconv_calc as a module of the package, as a script its directory would
+    # come first on sys.path and pyconv.py would shadow the pyconv package
     command = [
         sys.executable,
-        script_path,
+        "-m",
+        "pyconv.pyconv_calc",
         input_file,
         output_file,
         input_base,
         convert_to,
     ]
+    if prevalidate:
+        command.append("--prevalidate")
 
     # Start the process in the background
     subprocess.Popen(
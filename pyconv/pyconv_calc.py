@@ -11,9 +11,26 @@ License:
 """
 
 import logging
+import mmap
+import os
+import queue
+import shutil
 import sys
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import repeat
+from typing import BinaryIO, Callable, Generator, Iterator
+
 from click import Path
 
+# Compiled line converter, only present when the Cython extension was built
+try:
+    import pyconv._fast as _fast
+except ImportError:
+    _fast = None  # type: ignore[assignment]
+
 
 # Configure logging
 log_filename: str = "pyconv_errors.log"
@@ -25,11 +42,54 @@ logging.basicConfig(
 
 logger = logging.getLogger()
 
+# Deletion tables for str.translate, a string made up only of the allowed digits
+# translates to an empty string
+_BIN_KEEP: dict = str.maketrans("", "", "01")
+_OCT_KEEP: dict = str.maketrans("", "", "01234567")
+_HEX_KEEP: dict = str.maketrans("", "", "0123456789ABCDEF")
+
+# Radix for each input base flag
+_BASES: dict = {"b": 2, "o": 8, "d": 10, "x": 16}
+
+# Format spec for each conversion flag, decimal output uses the faster str()
+# rather than format()
+_FMT: dict = {"b": "b", "o": "o", "d": "d", "X": "X"}
+
+# Digits of each input base for the optional strict file mode pre-screen, a line
+# is converted only if deleting them leaves nothing. Lines int() would accept
+# with surrounding whitespace, a sign, a 0b/0o/0x prefix or underscores are
+# rejected. Unlike _HEX_KEEP these take lower case hex, which int() accepts too
+_DIGITS: dict = {
+    "b": b"01",
+    "o": b"01234567",
+    "d": b"0123456789",
+    "x": b"0123456789ABCDEFabcdef",
+}
+
+# File mode caches the conversions of short lines, longer lines skip it. Lines
+# are keyed as written, so zero padded and mixed case lines are separate keys.
+# Up to these lengths every line of plain digits still fits in the cache, 65534
+# binary, 37448 octal, 11110 decimal and 11154 hex keys, so a file of them can
+# not thrash it. Lines int() accepts with whitespace, signs or underscores can
+# push past the limit
+_CACHE_SIZE: int = 1 << 16
+_CACHED_LINE_LENGTH: dict = {"b": 15, "o": 5, "d": 4, "x": 3}
+
+# File mode reads the input in 1 MiB chunks, a reader thread keeps up to this
+# many chunks ready ahead of the conversion
+_IO_BUFFER_SIZE: int = 1 << 20
+_PREFETCH_BATCHES: int = 4
+
+# Input files larger than this are split across one worker process per CPU
+_PARALLEL_MIN_SIZE: int = 1 << 26
+
 
+@lru_cache(maxsize=1024, typed=True)
 def convert_num(given_num: int, convert_to: str) -> str:
     """
     Takes in a base 10 interger, uses a flag, to convert to
-        match which conversion is correct.
+        match which conversion is correct. Results are cached per argument type,
+        so repeated conversions of the same number are a dictionary lookup.
 
     Args:
         given_num (int): decimal base 10 number
@@ -41,42 +101,67 @@ def convert_num(given_num: int, convert_to: str) -> str:
     Raises:
         ValueError if convert_to does not match, 'b', 'o', 'd', 'X'
     """
-    match convert_to:
-        case "b":
-            return format(given_num, "b")
-        case "o":
-            return format(given_num, "o")
-        case "d":
-            return str(given_num)
-        case "X":
-            return format(given_num, "X")
-        case _:
-            raise ValueError("No such base conversion type")
+    if convert_to == "d":
+        return str(given_num)
+    try:
+        return format(given_num, _FMT[convert_to])
+    except KeyError:
+        raise ValueError("No such base conversion type")
+
+
+def _is_bin(user_input: str) -> bool:
+    return user_input != "" and not user_input.translate(_BIN_KEEP)
+
+
+def _is_oct(user_input: str) -> bool:
+    return user_input != "" and not user_input.translate(_OCT_KEEP)
+
+
+def _is_hex(user_input: str) -> bool:
+    return user_input != "" and not user_input.translate(_HEX_KEEP)
+
 
+# Validator for each input base flag, only the requested base is ever checked.
+# Like str.isdecimal(), each one rejects an empty string
+_VALIDATORS: dict = {
+    "b": _is_bin,
+    "o": _is_oct,
+    "d": str.isdecimal,
+    "x": _is_hex,
+}
 
-def input_validation(user_input: str) -> dict:
+
+def input_validation(user_input: str, input_base: str) -> bool:
     """
-        Takes in a user input and uses boolean character validation on it
+        Takes in a user input and uses boolean character validation on it for
+        the given base type. A stricter standalone check, input_to_int and file
+        mode don't call it and leave validation to int(), which also accepts
+        lower case hex, surrounding whitespace, signs, prefixes and
+        underscores, e.g. input_validation("2a", "x") is False while
+        input_to_int("2a", "x") returns 42.
     Args:
         user_input (str): user input number to perform validation on
+        input_base (str): flag representing base type of number, 'b', 'o', 'd'
+            or 'x'
 
     Returns:
-        dict: dictionary with keys being 'b', 'o', 'd', 'x' and values being
-            boolean validations
+        bool: True if the input is not empty and every character is a valid
+        digit of the base type
+
+    Raises:
+        ValueError on an invalid base type flag.
     """
-    return {
-        "b": all(char in "01" for char in user_input),
-        "o": all(char in "01234567" for char in user_input),
-        "d": user_input.isdecimal(),
-        "x": all(char in "0123456789ABCDEF" for char in user_input),
-    }
+    try:
+        return _VALIDATORS[input_base](user_input)
+    except KeyError:
+        raise ValueError("Invalid base type flag, only 'b', 'o', 'd' or 'x'")
 
 
 def input_to_int(input_num: str, input_base: str) -> int:
     """
     Takes a given input number as well as its flag for its base type, either
     'b' for binary, 'o' for octal, 'd' for decimal, 'x' for hexidecimal.
-    Performs input validation on the string.
+    The string is validated by int() as it is parsed, in a single pass.
 
     Args:
         input_num (str): string representation of a number input by user
@@ -89,29 +174,389 @@ def input_to_int(input_num: str, input_base: str) -> int:
         ValueError on invalid number input and flag input.
     """
 
-    # Enforcing user choice from click.Choice() ensures these will be the values
-    base_conversion_functions = {
-        "b": lambda num: int(num, base=2),
-        "o": lambda num: int(num, base=8),
-        "d": int,
-        "x": lambda num: int(num, base=16),
-    }
-
-    if not input_validation(input_num).get(input_base):
+    try:
+        return int(input_num, _BASES[input_base])
+    except KeyError:
+        raise ValueError("Invalid base type flag, only 'b', 'o', 'd' or 'x'")
+    except ValueError:
         raise ValueError(f"Invalid {input_base} number")
+
+
+def _line_converter(input_base: str, convert_to: str) -> Callable[[bytes], str]:
+    """
+    Resolves both base type flags once and returns a function converting a
+    single line of a file, so the per line work is one int() and one format()
+    call, which is str() for decimal output. Short lines are looked up in a cache
+    first, so files with many repeated small values skip both calls. Uses the
+    compiled converter from pyconv._fast when it is available.
+
+    Args:
+        input_base (str): flag representing base type of the input numbers.
+        convert_to (str): the flag representing the base type to convert to
+
+    Returns:
+        Callable[[bytes], str]: converts a line holding an input_base number to
+        its string representation in the convert_to base
+
+    Raises:
+        ValueError on an invalid input base or convert flag.
+    """
     try:
-        return base_conversion_functions[input_base](input_num)
+        base_in: int = _BASES[input_base]
     except KeyError:
         raise ValueError("Invalid base type flag, only 'b', 'o', 'd' or 'x'")
+    try:
+        fmt: str = _FMT[convert_to]
+    except KeyError:
+        raise ValueError("No such base conversion type")
+
+    max_len: int = _CACHED_LINE_LENGTH[input_base]
+
+    if _fast is not None:
+        return _fast.LineConverter(base_in, fmt, max_len, _CACHE_SIZE)
+
+    # An empty format spec formats an int with str(), skipping the spec parsing
+    # that "d" costs
+    if fmt == "d":
+        fmt = ""
+
+    # Default arguments make the radix and format spec fast local lookups
+    @lru_cache(maxsize=_CACHE_SIZE)
+    def convert_cached(line: bytes, _base: int = base_in, _fmt: str = fmt) -> str:
+        return format(int(line, _base), _fmt)
+
+    def convert_line(
+        line: bytes,
+        _base: int = base_in,
+        _fmt: str = fmt,
+        _cached: Callable[[bytes], str] = convert_cached,
+        _max_len: int = max_len,
+    ) -> str:
+        if len(line) <= _max_len:
+            return _cached(line)
+        return format(int(line, _base), _fmt)
+
+    return convert_line
+
+
+def _read_line_batches(inp: BinaryIO, size: int = -1) -> Iterator[list]:
+    """
+    Reads a binary file in chunks and splits each chunk into lines with
+    bytes.splitlines(). A line cut off at the end of a chunk is carried over
+    to the next one.
+
+    Args:
+        inp (BinaryIO): file opened in binary mode
+        size (int): number of bytes to read from the current position, -1
+        reads to the end of the file
+
+    Yields:
+        list: the complete lines of a chunk as bytes, without line separators
+    """
+    tail: bytes = b""
+    while size:
+        chunk: bytes = inp.read(
+            _IO_BUFFER_SIZE if size < 0 else min(size, _IO_BUFFER_SIZE)
+        )
+        if not chunk:
+            break
+        if size > 0:
+            size -= len(chunk)
+
+        chunk = tail + chunk
+        lines: list = chunk.splitlines()
+        if chunk.endswith(b"\n"):
+            tail = b""
+        else:
+            # Keep a trailing "\r" in case the "\n" of a "\r\n" is in the next chunk
+            tail = lines.pop() + (b"\r" if chunk.endswith(b"\r") else b"")
+        yield lines
+
+    if tail:
+        yield tail.splitlines()
+
+
+def _prefetch_line_batches(
+    inp: BinaryIO, size: int = -1
+) -> Generator[list, None, None]:
+    """
+    Reads the line batches of a file in a background thread, so reading the
+    next chunk from disk overlaps with converting the current one. The thread
+    stays at most _PREFETCH_BATCHES batches ahead, and has been joined once the
+    generator is closed.
+
+    Args:
+        inp (BinaryIO): file opened in binary mode, read from its current position
+        size (int): number of bytes to read, -1 reads to the end of the file
+
+    Yields:
+        list: the complete lines of a chunk as bytes, without line separators
+
+    Raises:
+        OSError raised while the thread was reading the file.
+    """
+    batch_queue: queue.Queue = queue.Queue(maxsize=_PREFETCH_BATCHES)
+    stop: threading.Event = threading.Event()
+
+    def read_batches() -> None:
+        try:
+            for lines in _read_line_batches(inp, size):
+                batch_queue.put(lines)
+                if stop.is_set():
+                    return
+        except Exception as exc:
+            batch_queue.put(exc)
+        else:
+            batch_queue.put(None)
+
+    reader: threading.Thread = threading.Thread(target=read_batches, daemon=True)
+    reader.start()
+    try:
+        while (item := batch_queue.get()) is not None:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # Empty the queue so a reader blocked on put() gets to see the stop flag
+        stop.set()
+        while True:
+            try:
+                batch_queue.get_nowait()
+            except queue.Empty:
+                break
+        reader.join()
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    """
+    Writes all of data to a raw file descriptor, os.write() may write less than
+    it was given.
+
+    Args:
+        fd (int): file descriptor opened for writing
+        data (bytes): bytes to write
+    """
+    view: memoryview = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+def _convert_batch_by_line(
+    lines: list,
+    convert_line: Callable[[bytes], str],
+    digits: bytes | None,
+    line_num: int,
+    errors: list,
+) -> str:
+    """
+    Converts a batch of lines one at a time, counting lines so the line number
+    of each invalid line can be recorded.
+
+    Args:
+        lines (list): lines of a chunk as bytes
+        convert_line (Callable[[bytes], str]): converter from _line_converter
+        digits (bytes | None): digits of the input base to pre-screen each line
+        with, None to rely on int() raising
+        line_num (int): number of lines before this batch
+        errors (list): line numbers of invalid lines are appended to this list
+
+    Returns:
+        str: converted lines each followed by a newline, invalid lines are left
+        empty
+    """
+    out_buf: list = []
+    for num in lines:
+        line_num += 1
+        # Invalid lines are caught by the scan without raising an exception
+        if digits is not None and (not num or num.translate(None, digits)):
+            errors.append(line_num)
+        else:
+            try:
+                out_buf.append(convert_line(num))
+            except ValueError:
+                errors.append(line_num)
+        out_buf.append("\n")
+
+    return "".join(out_buf)
+
+
+def _convert_range(
+    input_path: str,
+    output_path: str,
+    input_base: str,
+    convert_to: str,
+    start: int = 0,
+    end: int = -1,
+    prevalidate: bool = False,
+) -> tuple[int, list]:
+    """
+    Converts the lines between two byte offsets of the input file and writes
+    them to the output file. Called directly for small files and in a worker
+    process for each section of a large file.
+
+    Args:
+        input_path (str): Input file path
+        output_path (str): output file path, file will be created if it
+        doesn't exist
+        input_base (str): flag representing base type of numbers in the file.
+        convert_to (str): the flag representing the base type to convert to
+        start (int): byte offset of the first line to convert
+        end (int): byte offset to stop converting at, -1 for the end of the file
+        prevalidate (bool): pre-screen each line for invalid digits rather
+        than relying on int() raising
+
+    Returns:
+        tuple: number of lines converted and a list of the line numbers,
+        counted from start, which held an invalid number
+
+    Raises:
+        ValueError on an invalid input base or convert flag.
+    """
+    convert_line: Callable[[bytes], str] = _line_converter(input_base, convert_to)
+    digits: bytes | None = _DIGITS[input_base] if prevalidate else None
+    errors: list = []
+    line_num: int = 0
+
+    # The input is opened first so a missing file leaves the output untouched
+    with open(input_path, "rb") as inp:
+        inp.seek(start)
+        batches: Generator[list, None, None] = _prefetch_line_batches(
+            inp, -1 if end < 0 else end - start
+        )
+
+        # Output is plain ASCII, so each batch is encoded once and written straight
+        # to the file descriptor, skipping the text and buffered IO layers
+        out: int = os.open(output_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:
+            for lines in batches:
+                if not lines:
+                    continue
+
+                converted: str | None = None
+                if digits is None:
+                    # A batch without invalid lines is mapped in C with no line
+                    # counting, a ValueError sends it back through the line loop
+                    try:
+                        converted = "\n".join(map(convert_line, lines)) + "\n"
+                    except ValueError:
+                        pass
+                if converted is None:
+                    converted = _convert_batch_by_line(
+                        lines, convert_line, digits, line_num, errors
+                    )
+
+                _write_all(out, converted.encode("ascii"))
+                line_num += len(lines)
+        finally:
+            # Joins the reader thread before inp is closed under it
+            batches.close()
+            os.close(out)
+
+    return line_num, errors
+
+
+def _split_offsets(input_path: str, parts: int) -> list:
+    """
+    Splits a file into roughly equal sections, moving each boundary forward to
+    just after the next newline so no line is split between two sections.
+
+    Args:
+        input_path (str): Input file path, must not be empty
+        parts (int): number of sections to split the file in to
+
+    Returns:
+        list: byte offsets of the section boundaries, starting with 0 and
+        ending with the file size
+    """
+    with open(input_path, "rb") as inp, mmap.mmap(
+        inp.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        size: int = len(mm)
+        offsets: list = [0]
+        for part in range(1, parts):
+            newline: int = mm.find(b"\n", max(offsets[-1], size * part // parts))
+            if newline == -1:
+                break
+            offsets.append(newline + 1)
+        offsets.append(size)
+
+    return offsets
+
+
+def _convert_in_parallel(
+    input_path: str,
+    output_path: str,
+    input_base: str,
+    convert_to: str,
+    workers: int,
+    prevalidate: bool = False,
+) -> list:
+    """
+    Converts each section of the input file in its own worker process, each
+    worker writes to a temporary file and the temporary files are joined in
+    order into the output file.
+
+    Args:
+        input_path (str): Input file path
+        output_path (str): output file path, file will be created if it
+        doesn't exist
+        input_base (str): flag representing base type of numbers in the file.
+        convert_to (str): the flag representing the base type to convert to
+        workers (int): number of worker processes to split the file between
+        prevalidate (bool): pre-screen each line for invalid digits rather
+        than relying on int() raising
+
+    Returns:
+        list: line numbers of the whole file which held an invalid number
+    """
+    offsets: list = _split_offsets(input_path, workers)
+    output_dir: str = os.path.dirname(os.path.abspath(output_path))
+
+    # Temporary files sit next to the output file, so on the same file system
+    with tempfile.TemporaryDirectory(dir=output_dir) as tmp_dir:
+        part_paths: list = [
+            os.path.join(tmp_dir, f"part_{part}") for part in range(len(offsets) - 1)
+        ]
+        with ProcessPoolExecutor(max_workers=len(part_paths)) as pool:
+            results: list = list(
+                pool.map(
+                    _convert_range,
+                    repeat(input_path),
+                    part_paths,
+                    repeat(input_base),
+                    repeat(convert_to),
+                    offsets[:-1],
+                    offsets[1:],
+                    repeat(prevalidate),
+                )
+            )
+
+        with open(output_path, "wb") as out:
+            for part_path in part_paths:
+                with open(part_path, "rb") as part:
+                    shutil.copyfileobj(part, out, _IO_BUFFER_SIZE)
+
+    errors: list = []
+    line_offset: int = 0
+    for line_count, part_errors in results:
+        errors.extend(line_offset + line_num for line_num in part_errors)
+        line_offset += line_count
+
+    return errors
 
 
 def convert_from_file_to_file(
-    input_path: Path, output_path: Path, input_base: str, convert_to: str
+    input_path: Path,
+    output_path: Path,
+    input_base: str,
+    convert_to: str,
+    prevalidate: bool = False,
 ) -> None:
     """
     Takes in two file paths, an input file and output file, using click file
-    path validation on the input file. Reads in line by line,  writes the
-    converted values to the output file.
+    path validation on the input file. Reads in the input in binary chunks
+    split into lines, writes the converted values to the output file. Large
+    files are split between one worker process per CPU.
 
     Args:
         input_path (click.Path): Input file path
@@ -119,27 +564,50 @@ def convert_from_file_to_file(
         doesn't exist
         input_base (str): flag representing base type of numbers in the file.
         convert_to (str): the flag representing the base type to convert to
+        prevalidate (bool): pre-screen each line with a C level scan for
+        characters that are not digits of input_base, so invalid lines are
+        skipped without raising an exception. Faster for files with many
+        invalid lines, rejects whitespace, signs, prefixes and underscores
+        that int() would accept.
+
+    Raises:
+        ValueError on an invalid input base or convert flag.
     """
-    with open(input_path, "r") as inp, open(output_path, "w") as out:
-        for line_num, line in enumerate(inp, start=1):
-            num: str = line.rstrip()
-            try:
-                converted_num: str = convert_num(
-                    input_to_int(num, input_base), convert_to
-                )
-            except ValueError as ve:
-                logger.error("line: %s : %s", line_num, ve)
-                out.write("\n")
-            else:
-                out.write(converted_num + "\n")
+    # The helpers take plain string paths, converted once here
+    input_file: str = str(input_path)
+    output_file: str = str(output_path)
+    workers: int = os.cpu_count() or 1
+
+    if workers > 1 and os.path.getsize(input_file) > _PARALLEL_MIN_SIZE:
+        errors: list = _convert_in_parallel(
+            input_file, output_file, input_base, convert_to, workers, prevalidate
+        )
+    else:
+        _, errors = _convert_range(
+            input_file, output_file, input_base, convert_to, prevalidate=prevalidate
+        )
+
+    # One record for the whole file rather than a locked handler write per line
+    if errors:
+        logger.error(
+            "\n".join(
+                f"line: {line_num} : Invalid {input_base} number" for line_num in errors
+            )
+        )
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 5:
+    if len(sys.argv) not in (5, 6) or sys.argv[5:] not in ([], ["--prevalidate"]):
         print(
             "Usage: convert_from_file_to_file usage <input_file> <output_file>"
-            "<input_base> <convert_to>"
+            "<input_base> <convert_to> [--prevalidate]"
         )
         sys.exit(1)
     # Being called from pyconv.py as a child process
-    convert_from_file_to_file(sys.argv[1], sys.argv[2], sys.argv[3], sys.argv[4])
+    convert_from_file_to_file(
+        sys.argv[1],
+        sys.argv[2],
+        sys.argv[3],
+        sys.argv[4],
+        prevalidate=len(sys.argv) == 6,
+    )
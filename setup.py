@@ -0,0 +1,28 @@
+"""
+Builds the optional pyconv._fast extension, the package metadata lives in
+pyproject.toml. The extension is cythonized from _fast.pyx when Cython is
+installed, an sdist falls back to the _fast.c it ships. Without either, or
+without a C compiler, pyconv installs as pure Python.
+"""
+
+import os
+
+from setuptools import Extension, setup
+
+_PYX: str = os.path.join("pyconv", "_fast.pyx")
+_C: str = os.path.join("pyconv", "_fast.c")
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    cythonize = None
+
+ext_modules: list = []
+if cythonize is not None and os.path.exists(_PYX):
+    ext_modules = cythonize(
+        [Extension("pyconv._fast", [_PYX], optional=True)], language_level=3
+    )
+elif os.path.exists(_C):
+    ext_modules = [Extension("pyconv._fast", [_C], optional=True)]
+
+setup(ext_modules=ext_modules)
@@ -9,9 +9,14 @@ License:
     for details.
 """
 
+import os
+import subprocess
+import sys
+
 import pytest
 from click.testing import CliRunner
 
+from pyconv import pyconv as pyconv_module
 from pyconv.pyconv import pyconv
 
 
@@ -56,3 +61,44 @@ def test_if_input_is_taken_in_correctly(runner) -> None:
 
     assert result.exit_code == 0
     assert "7" in result.output
+
+
+@pytest.mark.parametrize("flags", [[], ["--prevalidate"]])
+def test_if_from_file_child_process_converts_file(
+    runner, tmp_path, monkeypatch, flags
+) -> None:
+    """
+    Captures the background command started by from-file and runs it to
+    completion, the child must import pyconv as a package, receive the
+    prevalidate flag and write the converted file.
+
+    Args:
+        runner (CliRunner): A pytest fixture representing a CliRunner object
+        flags (list): Extra from-file options
+    """
+    commands: list = []
+    input_path = tmp_path / "bin_nums.txt"
+    output_path = tmp_path / "converted.txt"
+    input_path.write_text("1\n10\n112\n111\n")
+
+    # Popen is only replaced while invoking, subprocess.run below needs the real one
+    with monkeypatch.context() as patch:
+        patch.setattr(
+            pyconv_module.subprocess,
+            "Popen",
+            lambda command, **kwargs: commands.append(command),
+        )
+        result = runner.invoke(
+            pyconv,
+            ["from-file", str(input_path), str(output_path), "b", "-d", *flags],
+        )
+    assert result.exit_code == 0
+
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=repo_root)
+    subprocess.run(commands[0], cwd=tmp_path, env=env, check=True)
+
+    assert commands[0][:3] == [sys.executable, "-m", "pyconv.pyconv_calc"]
+    assert commands[0][7:] == flags
+    assert output_path.read_text() == "1\n2\n\n7\n"
+    assert "line: 3 :" in (tmp_path / "pyconv_errors.log").read_text()
@@ -10,10 +10,11 @@ License:
 """
 
 import os
-from random import randint
+import threading
 
 import pytest
 import click
+from pyconv import pyconv_calc
 from pyconv.pyconv_calc import (
     convert_num,
     input_to_int,
@@ -22,17 +23,18 @@ from pyconv.pyconv_calc import (
 )
 
 
-@pytest.fixture(scope="module")
-def base_nums() -> list:
+@pytest.fixture(scope="module", params=[1, 7, 16, 42, 50])
+def base_nums(request) -> list:
     """
-        Fixture: Creates a random interger in range 1-50 returns a Tuple of
-        a single number of each popular base.
+        Fixture: Parametrized over fixed intergers in range 1-50, covering a
+        single digit, a power of two boundary and the top of the range,
+        returns a Tuple of a single number of each popular base.
 
     Returns:
         Tuple: Tuple Containing string representations of base 2/8/10/16 numbers
         only one number of each.
     """
-    dec_num: int = randint(1, 50)
+    dec_num: int = request.param
     bin_num: str = format(dec_num, "b")
     oct_num: str = format(dec_num, "o")
     hex_num: str = format(dec_num, "X")
@@ -40,7 +42,7 @@ def base_nums() -> list:
     return [bin_num, oct_num, str(dec_num), hex_num]
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def number_perms(base_nums) -> dict:
     """
     Creates a dictionary with base type flags, 'b', 'o', 'd', 'X' and lists
@@ -63,7 +65,7 @@ def number_perms(base_nums) -> dict:
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def conversion_perms(base_nums) -> dict:
     """
     Uses the decimal value from base_nums and calls the conversion function
@@ -75,18 +77,19 @@ def conversion_perms(base_nums) -> dict:
 
     Returns:
         dict: keys are single character flags matching the base type, 'b' for
-        binary etc. values are lists containing the other 3 base types after
-        calling the convert function.
+        binary etc. values are frozensets containing the other 3 base types
+        after calling the convert function.
     """
 
     base_flags: list = ["b", "o", "d", "X"]
+    dec_int: int = int(base_nums[2])
 
     converted_nums: dict = {
-        base: [
-            convert_num(int(base_nums[2]), rem_base)
+        base: frozenset(
+            convert_num(dec_int, rem_base)
             for rem_base in base_flags
             if rem_base != base
-        ]
+        )
         for base in base_flags
     }
 
@@ -145,22 +148,14 @@ def test_if_conversions_are_accurate(number_perms, conversion_perms) -> None:
         'b' for binary etc. values are lists containing the other 3 base
         type numbers.
         conversion_perms:keys are single character flags matching the base type,
-        'b' for binary etc. values are lists containing the other 3 base
+        'b' for binary etc. values are frozensets containing the other 3 base
         types after calling the convert function.
     """
 
-    assert all(
-        converted_val in conversion_perms["b"] for converted_val in number_perms["b"]
-    )
-    assert all(
-        converted_val in conversion_perms["o"] for converted_val in number_perms["o"]
-    )
-    assert all(
-        converted_val in conversion_perms["d"] for converted_val in number_perms["d"]
-    )
-    assert all(
-        converted_val in conversion_perms["X"] for converted_val in number_perms["X"]
-    )
+    assert conversion_perms["b"].issuperset(number_perms["b"])
+    assert conversion_perms["o"].issuperset(number_perms["o"])
+    assert conversion_perms["d"].issuperset(number_perms["d"])
+    assert conversion_perms["X"].issuperset(number_perms["X"])
 
 
 def test_convert_raises_value_error(base_nums) -> None:
@@ -177,7 +172,8 @@ def test_convert_raises_value_error(base_nums) -> None:
         convert_num(int(base_nums[2]), "k")
 
 
-def test_for_no_exception_for_correct_conversion_match(base_nums) -> None:
+@pytest.mark.parametrize("convert_to", ["b", "o", "d", "X"])
+def test_for_no_exception_for_correct_conversion_match(base_nums, convert_to) -> None:
     """
     Tests that the method convert_num does not raise a value error for
     expected convert flags.
@@ -185,15 +181,23 @@ def test_for_no_exception_for_correct_conversion_match(base_nums) -> None:
     Args:
         base_nums: pytest fixture returning a Tuple containing 1 each of a bin,
         octal, decimal, and hex number converted from the same decimal number.
+        convert_to: expected convert flag, one of 'b', 'o', 'd', 'X'
     """
 
-    with pytest.raises(ValueError, match=r""):
-        convert = convert_num(base_nums[2], "b")
-        convert = convert_num(base_nums[2], "o")
-        convert = convert_num(base_nums[2], "d")
-        convert = convert_num(base_nums[2], "X")
+    assert isinstance(convert_num(int(base_nums[2]), convert_to), str)
 
-        del convert
+
+def test_convert_num_cache_keeps_argument_types_apart() -> None:
+    """
+    Tests that a cached conversion of an int is not returned for an equal
+    float or bool.
+    """
+    assert convert_num(1, "b") == "1"
+    assert convert_num(1, "d") == "1"
+
+    with pytest.raises(ValueError):
+        convert_num(1.0, "b")
+    assert convert_num(True, "d") == "True"
 
 
 def test_binary_validation() -> None:
@@ -204,8 +208,9 @@ def test_binary_validation() -> None:
     invalid_binary: str = "112"
     vaild_binary: str = "10111011"
 
-    assert input_validation(invalid_binary).get("b") is False
-    assert input_validation(vaild_binary).get("b") is True
+    assert input_validation(invalid_binary, "b") is False
+    assert input_validation(vaild_binary, "b") is True
+    assert input_validation("", "b") is False
 
 
 def test_oct_validation() -> None:
@@ -217,9 +222,10 @@ def test_oct_validation() -> None:
     invalid_oct_char: str = "133D"
     valid_oct: str = "324"
 
-    assert input_validation(invalid_oct_8).get("o") is False
-    assert input_validation(invalid_oct_char).get("o") is False
-    assert input_validation(valid_oct).get("o") is True
+    assert input_validation(invalid_oct_8, "o") is False
+    assert input_validation(invalid_oct_char, "o") is False
+    assert input_validation(valid_oct, "o") is True
+    assert input_validation("", "o") is False
 
 
 def test_dec_validation() -> None:
@@ -230,8 +236,9 @@ def test_dec_validation() -> None:
     invalid_dec: str = "123456f"
     valid_dec: str = "1234567"
 
-    assert input_validation(invalid_dec).get("d") is False
-    assert input_validation(valid_dec).get("d") is True
+    assert input_validation(invalid_dec, "d") is False
+    assert input_validation(valid_dec, "d") is True
+    assert input_validation("", "d") is False
 
 
 def test_hex_validation() -> None:
@@ -244,9 +251,10 @@ def test_hex_validation() -> None:
     invalid_form_hex: str = "2a"
     valid_hex: str = "4B"
 
-    assert input_validation(invalid_hex).get("x") is False
-    assert input_validation(invalid_form_hex).get("x") is False
-    assert input_validation(valid_hex).get("x") is True
+    assert input_validation(invalid_hex, "x") is False
+    assert input_validation(invalid_form_hex, "x") is False
+    assert input_validation(valid_hex, "x") is True
+    assert input_validation("", "x") is False
 
 
 def test_if_input_to_int_is_accurate(base_nums) -> None:
@@ -265,18 +273,16 @@ def test_if_input_to_int_is_accurate(base_nums) -> None:
     assert input_to_int(base_nums[3], "x") == int(base_nums[3], base=16)
 
 
-def test_if_input_to_int_raises_value_error() -> None:
+@pytest.mark.parametrize(
+    "input_num, input_base",
+    [("112", "b"), ("58", "o"), ("23R", "d"), ("5T", "x"), ("12", "h")],
+)
+def test_if_input_to_int_raises_value_error(input_num, input_base) -> None:
     """
     Given invalid binary, octal, decimal, hexidecimal and base type flag
     """
     with pytest.raises(ValueError):
-        input_int = input_to_int("112", "b")
-        input_int = input_to_int("58", "o")
-        input_int = input_to_int("23R", "d")
-        input_int = input_to_int("5T", "x")
-        input_int = input_to_int("12", "h")
-
-        del input_int
+        input_to_int(input_num, input_base)
 
 
 def test_if_output_has_been_converted_correctly(converted_test_data) -> None:
@@ -345,4 +351,186 @@ def test_if_invalid_nums_in_file_are_logged_correctly(caplog) -> None:
     assert error_line_num_2 in log_records[1]
 
 
+def test_if_lines_split_across_read_chunks_are_converted(tmp_path, monkeypatch) -> None:
+    """
+    Shrinks the read chunk size so lines and "\r\n" line endings are split across
+    chunks, checks the output matches a line by line conversion of the input.
+    """
+    monkeypatch.setattr(pyconv_calc, "_IO_BUFFER_SIZE", 3)
+    input_path = tmp_path / "crlf_nums.txt"
+    output_path = tmp_path / "converted.txt"
+    input_path.write_bytes(b"1\r\n10\r\n1111011\r\n\r\n101")
+
+    convert_from_file_to_file(str(input_path), str(output_path), "b", "d")
+
+    assert output_path.read_text() == "1\n2\n123\n\n5\n"
+
+
+def test_if_write_error_stops_the_reader_thread(tmp_path, monkeypatch) -> None:
+    """
+    Fails the second write of a file read in several chunks, checks the error
+    reaches the caller and the prefetching reader thread has been joined.
+    """
+    monkeypatch.setattr(pyconv_calc, "_IO_BUFFER_SIZE", 3)
+    input_path = tmp_path / "bin_nums.txt"
+    input_path.write_text("1\n10\n11\n100\n101\n110\n111\n")
+    writes: list = []
+
+    def failing_write_all(fd: int, data: bytes) -> None:
+        writes.append(data)
+        if len(writes) == 2:
+            raise OSError("disk full")
+
+    monkeypatch.setattr(pyconv_calc, "_write_all", failing_write_all)
+    threads_before = set(threading.enumerate())
+
+    with pytest.raises(OSError, match="disk full"):
+        convert_from_file_to_file(
+            str(input_path), str(tmp_path / "converted.txt"), "b", "d"
+        )
+
+    assert set(threading.enumerate()) == threads_before
+
+
+def test_if_missing_input_file_raises_before_output_is_written(tmp_path) -> None:
+    """
+    Checks a missing input file surfaces as an OSError and leaves an existing
+    output file untouched.
+    """
+    output_path = tmp_path / "converted.txt"
+    output_path.write_text("previous output\n")
+
+    with pytest.raises(OSError):
+        convert_from_file_to_file(
+            str(tmp_path / "missing.txt"), str(output_path), "b", "d"
+        )
+
+    assert output_path.read_text() == "previous output\n"
+
+
+def test_if_parallel_conversion_matches_single_process(
+    tmp_path, monkeypatch, caplog
+) -> None:
+    """
+    Forces the invalid numbers file to be split between worker processes, checks
+    the joined output matches a single process conversion and invalid lines are
+    logged with their line number in the whole file.
+    """
+    test_dir = os.path.dirname(__file__)
+    invalid_path = os.path.join(test_dir, "invalid_nums.txt")
+    single_path = tmp_path / "single.txt"
+    parallel_path = tmp_path / "parallel.txt"
+
+    convert_from_file_to_file(invalid_path, str(single_path), "b", "d")
+    caplog.clear()
+
+    monkeypatch.setattr(pyconv_calc, "_PARALLEL_MIN_SIZE", 0)
+    monkeypatch.setattr(pyconv_calc.os, "cpu_count", lambda: 4)
+    convert_from_file_to_file(invalid_path, str(parallel_path), "b", "d")
+    log_records: list = caplog.text.split("\n")
+
+    assert parallel_path.read_text() == single_path.read_text()
+    assert "line: 6 :" in log_records[0]
+    assert "line: 12 :" in log_records[1]
+
+
+def test_if_prevalidated_conversion_matches_default(tmp_path, caplog) -> None:
+    """
+    Converts the invalid numbers file with and without the digit pre-screen,
+    its lines have no whitespace, signs, prefixes or underscores so both must
+    write the same output and log the same invalid lines.
+    """
+    test_dir = os.path.dirname(__file__)
+    invalid_path = os.path.join(test_dir, "invalid_nums.txt")
+    default_path = tmp_path / "default.txt"
+    prevalidated_path = tmp_path / "prevalidated.txt"
+
+    convert_from_file_to_file(invalid_path, str(default_path), "b", "d")
+    default_log: str = caplog.text
+    caplog.clear()
+    convert_from_file_to_file(
+        invalid_path, str(prevalidated_path), "b", "d", prevalidate=True
+    )
+
+    assert prevalidated_path.read_text() == default_path.read_text()
+    assert caplog.text == default_log
+
+
+@pytest.mark.parametrize(
+    "input_base, lines, default_output",
+    [
+        ("b", b"  11  \n1_0\n-1\n+1\n0b11\n", "3\n2\n-1\n1\n3\n"),
+        ("x", b"0x1f\n 1F\n-a\n1_f\n", "31\n31\n-10\n31\n"),
+    ],
+)
+def test_if_prevalidation_rejects_lines_int_would_accept(
+    tmp_path, caplog, input_base, lines, default_output
+) -> None:
+    """
+    Converts lines with whitespace, underscores, signs and prefixes, the
+    default mode converts them as int() does while the strict pre-screen logs
+    every one as invalid.
+    """
+    input_path = tmp_path / "loose_nums.txt"
+    default_path = tmp_path / "default.txt"
+    prevalidated_path = tmp_path / "prevalidated.txt"
+    input_path.write_bytes(lines)
+    line_count: int = lines.count(b"\n")
+
+    convert_from_file_to_file(str(input_path), str(default_path), input_base, "d")
+    assert default_path.read_text() == default_output
+    assert caplog.text == ""
+
+    convert_from_file_to_file(
+        str(input_path), str(prevalidated_path), input_base, "d", prevalidate=True
+    )
+    assert prevalidated_path.read_text() == "\n" * line_count
+    for line_num in range(1, line_count + 1):
+        assert f"line: {line_num} : Invalid {input_base} number" in caplog.text
+
+
+def test_if_repeated_lines_are_converted_consistently(tmp_path, caplog) -> None:
+    """
+    Short lines are served from a cache after their first conversion, repeated
+    valid lines must convert the same and repeated invalid lines must still be
+    logged every time.
+    """
+    input_path = tmp_path / "repeated_nums.txt"
+    output_path = tmp_path / "converted.txt"
+    long_bin: str = "1" * 40
+    input_path.write_text(f"101\n12\n101\n{long_bin}\n12\n{long_bin}\n")
+
+    convert_from_file_to_file(str(input_path), str(output_path), "b", "X")
+    log_records: list = caplog.text.split("\n")
+
+    assert output_path.read_text() == "5\n\n5\nFFFFFFFFFF\n\nFFFFFFFFFF\n"
+    assert "line: 2 :" in log_records[0]
+    assert "line: 5 :" in log_records[1]
+
+
+@pytest.mark.parametrize("input_base, convert_to", [("b", "d"), ("d", "X"), ("x", "o")])
+def test_if_compiled_converter_matches_python_converter(
+    monkeypatch, input_base, convert_to
+) -> None:
+    """
+    When the Cython extension is built, checks its line converter gives the same
+    results and raises on the same invalid lines as the pure Python converter.
+    """
+    pytest.importorskip("pyconv._fast")
+    lines: list = [b"1", b"10", b"101", b"12", b"", b"1\x000"]
+
+    compiled = pyconv_calc._line_converter(input_base, convert_to)
+    monkeypatch.setattr(pyconv_calc, "_fast", None)
+    python = pyconv_calc._line_converter(input_base, convert_to)
+
+    for line in lines:
+        try:
+            expected = python(line)
+        except ValueError:
+            with pytest.raises(ValueError):
+                compiled(line)
+        else:
+            assert compiled(line) == expected
+
+
 # TODO run click integration tests